@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Summary Cache
+
+Content-addressed cache for agent LLM calls. Re-summarizing the same file or URL
+returns the stored response instead of making another LLM round-trip.
+
+Opt-in: entries are kept in a small SQLite database and expire after
+SUMMARY_CACHE_TTL seconds. The default of 0 disables caching.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SUMMARY_CACHE_PATH, SUMMARY_CACHE_TTL
+from llm_client import chat_completion, get_llm_client
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+
+# Expired rows are deleted every this many writes so the file doesn't grow forever
+_PURGE_EVERY = 100
+
+# One connection per thread (sqlite3 connections can't be shared across threads)
+_local = threading.local()
+
+# Write counter for purging; next() on itertools.count is atomic, unlike += on a global
+_write_count = itertools.count()
+
+
+def _connect() -> sqlite3.Connection:
+    """Get this thread's connection to the cache database, creating it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(os.path.dirname(SUMMARY_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(SUMMARY_CACHE_PATH, timeout=5)
+        conn.execute(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def make_key(messages: List[Dict[str, str]], temperature: float, max_tokens: int, model: str) -> str:
+    """Hash the model, sampling parameters and full prompt into a cache key."""
+    payload = json.dumps([model, temperature, max_tokens, messages], sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=32).hexdigest()
+
+
+def _active_model() -> Optional[str]:
+    """
+    Identify the model(s) currently serving requests, or None if unknown.
+
+    Keying on what the server reports (not the configured name) means switching
+    the model loaded in LM Studio no longer returns the old model's summaries.
+    """
+    try:
+        models = get_llm_client().list_models()
+    except Exception as e:
+        logger.warning(f"Summary cache: could not determine the loaded model, not caching: {e}")
+        return None
+    return ','.join(models) or None
+
+
+def get(key: str) -> Optional[str]:
+    """Return the cached value for key, or None if missing or expired."""
+    try:
+        conn = _connect()
+        with conn:
+            row = conn.execute("SELECT value, expires FROM llm_cache WHERE key = ?", (key,)).fetchone()
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Summary cache read failed: {e}")
+        return None
+
+    if row is None or row[1] < time.time():
+        return None
+    return row[0]
+
+
+def put(key: str, value: str, ttl: Optional[int] = None) -> None:
+    """Store value under key for ttl seconds (default SUMMARY_CACHE_TTL), purging expired entries now and then."""
+    if ttl is None:
+        ttl = SUMMARY_CACHE_TTL
+    now = time.time()
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, now + ttl)
+            )
+            if next(_write_count) % _PURGE_EVERY == 0:
+                conn.execute("DELETE FROM llm_cache WHERE expires < ?", (now,))
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Summary cache write failed: {e}")
+
+
+def cached_chat_completion(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    timeout: int = 60
+) -> str:
+    """
+    chat_completion() with a cache in front of it.
+
+    Only successful responses are stored; errors propagate to the caller as before.
+    """
+    model = _active_model() if SUMMARY_CACHE_TTL > 0 else None
+    if model is None:
+        return chat_completion(messages=messages, temperature=temperature, max_tokens=max_tokens, timeout=timeout)
+
+    key = make_key(messages, temperature, max_tokens, model)
+    cached = get(key)
+    if cached is not None:
+        logger.info("Summary cache hit, skipping LLM call")
+        return cached
+
+    response = chat_completion(messages=messages, temperature=temperature, max_tokens=max_tokens, timeout=timeout)
+    put(key, response)
+    return response
@@ -12,9 +12,8 @@ Usage:
 import re
 import requests
 import json
-from bs4 import BeautifulSoup
 import logging
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, TYPE_CHECKING
 import sys
 import os
 
@@ -30,6 +29,9 @@ from config import (
 from llm_client import chat_completion
 from credential_manager import get_credential, mask_secret
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
 logger = logging.getLogger(__name__)
 
 
@@ -428,7 +430,8 @@ class APICallerAgent(BaseAgent):
                 response = requests.get(current_url, headers=headers, timeout=REQUEST_TIMEOUT)
                 response.raise_for_status()
 
-                # Parse HTML
+                # Parse HTML (bs4 is imported on first use to keep startup light)
+                from bs4 import BeautifulSoup
                 soup = BeautifulSoup(response.content, 'html.parser')
 
                 # Extract links for potential follow-up (only from first page)
@@ -472,7 +475,7 @@ class APICallerAgent(BaseAgent):
         logger.info(f"Successfully fetched {len(visited_urls)} pages, total {len(combined_docs)} characters")
         return combined_docs
 
-    def _extract_relevant_links(self, soup: BeautifulSoup, base_url: str, base_domain: str) -> list:
+    def _extract_relevant_links(self, soup: 'BeautifulSoup', base_url: str, base_domain: str) -> list:
         """
         Extract relevant documentation links from a page.
         Prioritizes links that likely contain API information.
@@ -546,7 +549,8 @@ class APICallerAgent(BaseAgent):
             response = requests.get(page_url, headers=headers, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
 
-            # Parse HTML
+            # Parse HTML (bs4 is imported on first use to keep startup light)
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(response.content, 'html.parser')
 
             # Common OpenAPI spec file patterns
@@ -7,33 +7,115 @@ Can only access files within the project directory (artefacts folder recommended
 """
 
 import re
+import functools
 import requests
 import json
 import csv
 import os
+import mmap
+import time
 import logging
 from typing import Dict, Any, Optional
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add parent directory to path to import base_agent
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from base_agent import BaseAgent
 from config import SUMMARY_MAX_TOKENS, SUMMARY_TEMPERATURE
-from llm_client import chat_completion
+from agents._llm_cache import cached_chat_completion
 
 logger = logging.getLogger(__name__)
 
+# System prompt for file summaries. The per-file part is only the user message.
+_SUMMARY_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a helpful assistant that creates concise, informative summaries of documents and data files. "
+               "Please provide a concise summary of the file you are given."
+}
+
+# File types the agent can read (FileReaderAgent.SUPPORTED_EXTENSIONS)
+_SUPPORTED_EXTENSIONS = ('.json', '.csv', '.txt', '.pdf', '.md', '.log')
+
+# File operation keywords checked by can_handle
+_FILE_OPERATION_PATTERN = r'file:|read file|write file|save to|save as|write to'
+
+# can_handle triggers: an operation keyword or any supported extension, in one scan
+_TRIGGER_RE = re.compile(
+    _FILE_OPERATION_PATTERN + ''.join('|' + re.escape(ext) for ext in _SUPPORTED_EXTENSIONS),
+    re.IGNORECASE
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _is_file_request(message: str) -> bool:
+    """Whether message mentions a file operation or a readable file extension (cached)."""
+    return bool(_TRIGGER_RE.search(message))
+
+
+# Write patterns: "save ... to", "write ... to", "save as", etc.
+_WRITE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'\bsave\s+.*\s+to\b',           # "save X to" or "save that result to"
+        r'\bwrite\s+.*\s+to\b',          # "write X to" or "write that to"
+        r'\bsave\s+as\b',                 # "save as"
+        r'\bwrite\s+as\b',                # "write as"
+        r'\bsave\s+to\b',                 # "save to"
+        r'\bwrite\s+to\b',                # "write to"
+        r'\bwrite\s+file\b',              # "write file"
+    )
+]
+
+# "file:path" protocol used by _extract_file_path
+_FILE_PROTOCOL_RE = re.compile(r'file:/?/?([^\s]+)')
+
+# Destination patterns used by _extract_write_path, tried in order
+_WRITE_PATH_PATTERNS = [
+    # With quotes: "save to 'file.json'"
+    re.compile(r'(?:save|write)\s+.*?(?:to|as)\s+["\']([^"\']+\.(?:json|csv|txt|md|log))["\']', re.IGNORECASE),
+    # Natural language: "save [anything] to X" or "write [anything] to X"
+    # This handles: "save this message to", "save message to", "save that result to", etc.
+    re.compile(r'(?:save|write)\s+.*?(?:to|as)\s+([^\s:]+\.(?:json|csv|txt|md|log))', re.IGNORECASE),
+]
+
+# Inline content after the destination: "save to file.json: {content}"
+_WRITE_CONTENT_RE = re.compile(
+    r'(?:save|write)\s+.*?(?:to|as)\s+([^\s:]+\.(?:json|csv|txt|md|log))\s*:?\s*(.+)',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Keywords that explicitly request overwriting an existing file
+# A run of 20+ digits may be an integer beyond 64 bits, which orjson would turn
+# into a float; such JSON files are parsed with the stdlib instead
+_LONG_DIGITS_RE = re.compile(rb'\d{20}')
+
+_OVERWRITE_RE = re.compile(r'overwrite|replace|write over|rewrite|update(?:\s+the)?\s+file', re.IGNORECASE)
+
 
 class FileReaderAgent(BaseAgent):
     """Agent that reads and writes local files."""
 
-    SUPPORTED_EXTENSIONS = {'.json', '.csv', '.txt', '.pdf', '.md', '.log'}
+    SUPPORTED_EXTENSIONS = set(_SUPPORTED_EXTENSIONS)
     WRITABLE_EXTENSIONS = {'.json', '.csv', '.txt', '.md', '.log'}  # PDF excluded from writing
+    MMAP_THRESHOLD = 1 << 20  # Memory-map JSON files larger than 1 MiB instead of reading them
+
+    # Per-extension path patterns for _extract_file_path:
+    # (absolute/home path like /path/to/file.ext or ~/file.ext, relative path)
+    _EXTENSION_PATTERNS = [
+        (re.compile(rf'([~/][^\s]+{re.escape(ext)})'), re.compile(rf'([^\s]+{re.escape(ext)})'))
+        for ext in SUPPORTED_EXTENSIONS
+    ]
 
     def __init__(self):
         """Initialize with the base directory for security."""
         # Get the base directory (where the Flask app is running)
         self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        # Resolved once; symlinks in the base path don't change while running
+        self._real_base_dir = os.path.realpath(self.base_dir)
         self.artefacts_dir = os.path.join(self.base_dir, 'artefacts')
         logger.info(f"File Agent: Base directory set to {self.base_dir}")
         logger.info(f"File Agent: Artefacts directory at {self.artefacts_dir}")
@@ -61,37 +143,13 @@ class FileReaderAgent(BaseAgent):
         return "file:artefacts/data.json or save to artefacts/results.json or write to artefacts/output.txt"
 
     def can_handle(self, message: str) -> bool:
-        """Check if message contains a file operation."""
-        message_lower = message.lower()
-
-        # Check for file operations
-        if any(trigger in message_lower for trigger in ['file:', 'read file', 'write file', 'save to', 'save as', 'write to']):
-            return True
-
-        # Check for file extensions
-        for ext in self.SUPPORTED_EXTENSIONS:
-            if ext in message_lower:
-                return True
-
-        return False
+        """Check if message contains a file operation or a supported file extension."""
+        return _is_file_request(message)
 
     def process(self, message: str, full_context: Dict[str, Any]) -> str:
         """Process file read or write operation."""
-        message_lower = message.lower()
-
         # Determine if this is a write or read operation using regex patterns
-        # Check for write patterns: "save ... to", "write ... to", "save as", etc.
-        write_patterns = [
-            r'\bsave\s+.*\s+to\b',           # "save X to" or "save that result to"
-            r'\bwrite\s+.*\s+to\b',          # "write X to" or "write that to"
-            r'\bsave\s+as\b',                 # "save as"
-            r'\bwrite\s+as\b',                # "write as"
-            r'\bsave\s+to\b',                 # "save to"
-            r'\bwrite\s+to\b',                # "write to"
-            r'\bwrite\s+file\b',              # "write file"
-        ]
-
-        is_write = any(re.search(pattern, message_lower) for pattern in write_patterns)
+        is_write = any(pattern.search(message) for pattern in _WRITE_PATTERNS)
 
         if is_write:
             return self._handle_write(message, full_context)
@@ -199,25 +257,22 @@ class FileReaderAgent(BaseAgent):
     def _extract_file_path(self, text: str) -> str:
         """Extract file path from message."""
         # Try file: protocol first
-        file_protocol_pattern = r'file:/?/?([^\s]+)'
-        match = re.search(file_protocol_pattern, text)
+        match = _FILE_PROTOCOL_RE.search(text)
         if match:
             path = match.group(1)
             # Expand home directory if needed
             return os.path.expanduser(path)
 
         # Try to find path-like strings with supported extensions
-        for ext in self.SUPPORTED_EXTENSIONS:
+        for absolute_pattern, relative_pattern in self._EXTENSION_PATTERNS:
             # Look for patterns like /path/to/file.ext or ~/path/to/file.ext
-            pattern = rf'([~/][^\s]+{re.escape(ext)})'
-            match = re.search(pattern, text)
+            match = absolute_pattern.search(text)
             if match:
                 path = match.group(1)
                 return os.path.expanduser(path)
 
             # Look for relative paths
-            pattern = rf'([^\s]+{re.escape(ext)})'
-            match = re.search(pattern, text)
+            match = relative_pattern.search(text)
             if match:
                 path = match.group(1)
                 # Remove any surrounding quotes
@@ -236,7 +291,7 @@ class FileReaderAgent(BaseAgent):
             absolute_path = os.path.realpath(os.path.expanduser(file_path))
 
             # Get the real base directory
-            real_base_dir = os.path.realpath(self.base_dir)
+            real_base_dir = self._real_base_dir
 
             # Check if the file path is within the base directory
             # os.path.commonpath returns the common path prefix
@@ -264,16 +319,8 @@ class FileReaderAgent(BaseAgent):
     def _extract_write_path(self, text: str) -> Optional[str]:
         """Extract destination file path from write operation."""
         # Patterns: "save to X", "write to X", "save as X", "save that result to X"
-        patterns = [
-            # With quotes: "save to 'file.json'"
-            r'(?:save|write)\s+.*?(?:to|as)\s+["\']([^"\']+\.(?:json|csv|txt|md|log))["\']',
-            # Natural language: "save [anything] to X" or "write [anything] to X"
-            # This handles: "save this message to", "save message to", "save that result to", etc.
-            r'(?:save|write)\s+.*?(?:to|as)\s+([^\s:]+\.(?:json|csv|txt|md|log))',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _WRITE_PATH_PATTERNS:
+            match = pattern.search(text)
             if match:
                 path = match.group(1).strip('"\'')
                 # Remove trailing punctuation like colons
@@ -296,8 +343,7 @@ class FileReaderAgent(BaseAgent):
         # Look for content after the filename - "save this message to file.txt\n\nCONTENT"
         # or "save to file.json: {content}"
         # Extract everything after the file path
-        file_path_match = re.search(r'(?:save|write)\s+.*?(?:to|as)\s+([^\s:]+\.(?:json|csv|txt|md|log))\s*:?\s*(.+)',
-                                     message, re.DOTALL | re.IGNORECASE)
+        file_path_match = _WRITE_CONTENT_RE.search(message)
         if file_path_match and file_path_match.group(2):
             content_str = file_path_match.group(2).strip()
             if content_str:
@@ -317,13 +363,17 @@ class FileReaderAgent(BaseAgent):
         """Write content to file based on extension."""
         if ext == '.json':
             with open(file_path, 'w', encoding='utf-8') as f:
-                if isinstance(content, str):
-                    # Try to parse string as JSON first
+                # Objects/arrays were already decoded upstream (_extract_write_content,
+                # or response.json() in the API agent); a string that still looks like
+                # one failed to parse there, so only retry scalar-looking strings.
+                if isinstance(content, str) and not content.lstrip().startswith(('{', '[')):
                     try:
                         content = json.loads(content)
                     except:
                         pass
-                json.dump(content, f, indent=2, ensure_ascii=False)
+                # Serialize up front and issue one write; json.dump would call
+                # f.write once per encoded token
+                f.write(json.dumps(content, indent=2, ensure_ascii=False))
                 logger.info(f"Wrote JSON to {file_path}")
 
         elif ext == '.csv':
@@ -351,22 +401,22 @@ class FileReaderAgent(BaseAgent):
         Generate a filename based on content type and message context.
         Returns a filename with appropriate extension.
         """
-        from datetime import datetime
+        message_lower = message.lower()
 
         # Determine file extension based on content type
         if isinstance(content, dict) or isinstance(content, list):
             ext = '.json'
-        elif 'csv' in message.lower():
+        elif 'csv' in message_lower:
             ext = '.csv'
-        elif 'markdown' in message.lower() or 'md' in message.lower():
+        elif 'markdown' in message_lower or 'md' in message_lower:
             ext = '.md'
-        elif 'log' in message.lower():
+        elif 'log' in message_lower:
             ext = '.log'
         else:
             ext = '.txt'
 
         # Generate timestamp-based filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
         filename = f"output_{timestamp}{ext}"
 
         logger.info(f"Generated filename: {filename}")
@@ -374,21 +424,12 @@ class FileReaderAgent(BaseAgent):
 
     def _should_overwrite(self, message: str) -> bool:
         """Check if message explicitly requests to overwrite existing file."""
-        message_lower = message.lower()
-        overwrite_keywords = [
-            'overwrite',
-            'replace',
-            'write over',
-            'rewrite',
-            'update the file',
-            'update file'
-        ]
-        return any(keyword in message_lower for keyword in overwrite_keywords)
+        return bool(_OVERWRITE_RE.search(message))
 
     def _get_unique_filename(self, file_path: str) -> str:
         """
         Generate a unique filename by adding _1, _2, etc. if file exists.
-        Example: file.txt -> file_1.txt -> file_2.txt
+        Example: file.txt -> file_1.txt -> file_2.txt (one past the highest existing suffix)
         """
         if not os.path.exists(file_path):
             return file_path
@@ -397,13 +438,18 @@ class FileReaderAgent(BaseAgent):
         filename = os.path.basename(file_path)
         name, ext = os.path.splitext(filename)
 
-        counter = 1
-        while True:
-            new_filename = f"{name}_{counter}{ext}"
-            new_path = os.path.join(directory, new_filename)
-            if not os.path.exists(new_path):
-                return new_path
-            counter += 1
+        # Scan the directory once for existing name_N copies instead of
+        # probing each candidate with os.path.exists
+        prefix = f"{name}_"
+        highest = 0
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix) and entry.name.endswith(ext):
+                    suffix = entry.name[len(prefix):len(entry.name) - len(ext)]
+                    if suffix.isascii() and suffix.isdigit():
+                        highest = max(highest, int(suffix))
+
+        return os.path.join(directory, f"{name}_{highest + 1}{ext}")
 
     def _read_file(self, file_path: str, ext: str) -> str:
         """Read file content based on extension."""
@@ -418,47 +464,135 @@ class FileReaderAgent(BaseAgent):
 
     def _read_json(self, file_path: str) -> str:
         """Read and format JSON file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        max_chars = 4000
 
-        # Pretty print JSON
-        formatted = json.dumps(data, indent=2)
+        # Parse and pretty print JSON
+        formatted = None
+        if orjson is not None:
+            try:
+                # OPT_INDENT_2 matches indent=2
+                pretty = orjson.dumps(self._load_json_orjson(file_path), option=orjson.OPT_INDENT_2)
+                # UTF-8 needs at most 4 bytes per character, so only decode
+                # what the size limit below can use
+                formatted = pretty[:(max_chars + 1) * 4].decode('utf-8', errors='ignore')
+            except (ValueError, orjson.JSONEncodeError):
+                # orjson is stricter (e.g. NaN literals) or would lose precision
+                # on big integers; let json decide
+                pass
+        if formatted is None:
+            # The whole document is needed to parse it, so read it in one go
+            with open(file_path, 'rb') as f:
+                formatted = json.dumps(json.loads(f.read()), indent=2)
 
         # Limit size
-        max_chars = 4000
         if len(formatted) > max_chars:
             formatted = formatted[:max_chars] + "\n\n[Content truncated]"
 
         return f"JSON Content:\n\n{formatted}"
 
+    def _load_json_orjson(self, file_path: str) -> Any:
+        """
+        Parse a JSON file with orjson.
+        Files over MMAP_THRESHOLD are parsed straight from a read-only memory
+        map, so the document is never copied into a separate bytes object.
+        Raises ValueError for documents orjson can't represent exactly.
+        """
+        if os.path.getsize(file_path) > self.MMAP_THRESHOLD:
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if _LONG_DIGITS_RE.search(mm):
+                    raise ValueError("possible integer beyond 64 bits")
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+
+        # The whole document is needed to parse it, so read it in one go
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if _LONG_DIGITS_RE.search(data):
+            raise ValueError("possible integer beyond 64 bits")
+        return orjson.loads(data)
+
     def _read_csv(self, file_path: str) -> str:
         """Read and format CSV file."""
+        max_rows = 100  # Limit to first 100 rows
+        try:
+            rows = self._read_csv_rows_pyarrow(file_path, max_rows)
+        except ImportError:
+            rows = self._read_csv_rows(file_path, max_rows)
+        except Exception as e:
+            # pyarrow is stricter than csv.reader (e.g. rows with differing column counts)
+            logger.warning(f"pyarrow could not parse CSV, falling back to csv module: {e}")
+            rows = self._read_csv_rows(file_path, max_rows)
+
+        # Format as text
+        parts = ["CSV Content:\n"]
+        parts.extend(" | ".join(map(str, row)) for row in rows)
+        content = "\n".join(parts) + "\n"
+
+        if len(rows) >= max_rows:
+            content += f"\n[Showing first {max_rows} rows]"
+
+        return content
+
+    def _read_csv_rows(self, file_path: str, max_rows: int) -> list:
+        """Read up to max_rows non-blank rows with the stdlib csv module."""
         rows = []
         with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
+            reader = filter(None, csv.reader(f))
             for i, row in enumerate(reader):
-                if i < 100:  # Limit to first 100 rows
+                if i < max_rows:
                     rows.append(row)
                 else:
                     break
+        return rows
 
-        # Format as text
-        content = "CSV Content:\n\n"
-        for row in rows:
-            content += " | ".join(str(cell) for cell in row) + "\n"
-
-        if len(rows) >= 100:
-            content += "\n[Showing first 100 rows]"
+    def _read_csv_rows_pyarrow(self, file_path: str, max_rows: int) -> list:
+        """
+        Read up to max_rows rows with pyarrow's streaming CSV reader.
+        Tokenizing happens in C++ and only the batches needed are read.
+        Raises ImportError if pyarrow is not installed.
+        """
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        # The preview shows cells as written, so every column is read as a
+        # non-null string (no "007" -> 7.0 type inference). The column count
+        # comes from the first record.
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            first_row = next(filter(None, csv.reader(f)), None)
+        if not first_row:
+            return []
+
+        # Autogenerated column names keep the header line as a data row,
+        # matching csv.reader output. A 64 KiB block (default 1 MiB) keeps the
+        # bytes read close to what a 100-row preview actually needs.
+        read_options = pacsv.ReadOptions(autogenerate_column_names=True, block_size=1 << 16)
+        convert_options = pacsv.ConvertOptions(
+            column_types={f"f{i}": pa.string() for i in range(len(first_row))},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False
+        )
 
-        return content
+        rows = []
+        with pacsv.open_csv(file_path, read_options=read_options, convert_options=convert_options) as reader:
+            for batch in reader:
+                columns = [column.to_pylist() for column in batch.columns]
+                rows.extend(map(list, zip(*columns)))
+                if len(rows) >= max_rows:
+                    break
+        return rows[:max_rows]
 
     def _read_text(self, file_path: str) -> str:
         """Read plain text file."""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        max_chars = 4000
+
+        # Only the first max_chars characters are used; UTF-8 needs at most
+        # 4 bytes per character, so read just enough bytes to fill the limit
+        # (plus one character to detect truncation) in a single unbuffered read
+        with open(file_path, 'rb', buffering=0) as f:
+            raw = f.read((max_chars + 1) * 4)
+        content = raw.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
 
         # Limit size
-        max_chars = 4000
         if len(content) > max_chars:
             content = content[:max_chars] + "\n\n[Content truncated]"
 
@@ -467,32 +601,44 @@ class FileReaderAgent(BaseAgent):
     def _read_pdf(self, file_path: str) -> str:
         """Read PDF file."""
         try:
-            import PyPDF2
+            import pypdfium2 as pdfium
 
-            content = "PDF Content:\n\n"
-            with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                num_pages = len(pdf_reader.pages)
+            max_chars = 4000
+            parts = ["PDF Content:\n\n"]
+            total_len = len(parts[0])
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                num_pages = len(pdf)
 
                 # Read first 10 pages or all pages if less than 10
                 pages_to_read = min(10, num_pages)
                 for i in range(pages_to_read):
-                    page = pdf_reader.pages[i]
-                    content += f"--- Page {i+1} ---\n"
-                    content += page.extract_text()
-                    content += "\n\n"
+                    page = pdf[i]
+                    text_page = page.get_textpage()
+                    part = f"--- Page {i+1} ---\n{text_page.get_text_range()}\n\n"
+                    text_page.close()
+                    page.close()
+                    parts.append(part)
+                    total_len += len(part)
+
+                    # Everything past max_chars is truncated below, so stop extracting
+                    if total_len >= max_chars:
+                        break
 
                 if num_pages > pages_to_read:
-                    content += f"\n[Showing first {pages_to_read} of {num_pages} pages]"
+                    parts.append(f"\n[Showing first {pages_to_read} of {num_pages} pages]")
+            finally:
+                pdf.close()
+
+            content = "".join(parts)
 
             # Limit total size
-            max_chars = 4000
             if len(content) > max_chars:
                 content = content[:max_chars] + "\n\n[Content truncated]"
 
             return content
         except ImportError:
-            return "PDF support requires PyPDF2. Install it with: pip install PyPDF2"
+            return "PDF support requires pypdfium2. Install it with: pip install pypdfium2"
         except Exception as e:
             logger.error(f"Error reading PDF: {e}")
             return f"Error reading PDF: {str(e)}"
@@ -501,13 +647,10 @@ class FileReaderAgent(BaseAgent):
         """Send content to LLM for summarization."""
         try:
             filename = os.path.basename(file_path)
-            prompt = f"Please provide a concise summary of the following file ({filename}):\n\n{content}"
+            prompt = f"File: {filename}\n\n{content}"
 
             messages = [
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that creates concise, informative summaries of documents and data files."
-                },
+                _SUMMARY_SYSTEM_MESSAGE,
                 {
                     "role": "user",
                     "content": prompt
@@ -515,7 +658,7 @@ class FileReaderAgent(BaseAgent):
             ]
 
             logger.info("Sending to LLM for summarization...")
-            summary = chat_completion(
+            summary = cached_chat_completion(
                 messages=messages,
                 temperature=SUMMARY_TEMPERATURE,
                 max_tokens=SUMMARY_MAX_TOKENS,
@@ -10,6 +10,7 @@ Usage:
 """
 
 import re
+import functools
 import requests
 import logging
 from typing import Dict, Any
@@ -24,6 +25,59 @@ from llm_client import chat_completion
 
 logger = logging.getLogger(__name__)
 
+# Constant system prompt for formatting requests, built once. All fixed
+# instructions live here so every request shares a byte-identical prompt
+# prefix that the LLM server can reuse from its KV cache.
+_FORMAT_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": """You are a markdown formatting expert. Always respond with properly formatted Markdown syntax only.
+
+Format the content you are given into well-structured Markdown.
+
+Instructions:
+- Use appropriate Markdown syntax (headings, lists, tables, code blocks, bold, italic, etc.)
+- Make it well-organized and easy to read
+- Use proper hierarchy with headings (# ## ###)
+- Create tables for tabular data
+- Use code blocks for code or technical content
+- Use bullet points or numbered lists where appropriate
+- Make it visually appealing and well-formatted
+- Return ONLY the formatted markdown, no explanations"""
+}
+
+# Everything can_handle accepts, in one case-insensitive search:
+# explicit triggers ("format_markdown:", "markdown:", "to/as markdown"), or
+# "markdown" together with "format"/"beautify", or "clean up" with "markdown"/"md"
+_TRIGGER_RE = re.compile(
+    r'markdown:|(?:to|as) markdown'
+    r'|\A(?=.*markdown)(?=.*(?:format|beautify))'
+    r'|\A(?=.*clean up)(?=.*(?:markdown|md))',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _is_markdown_request(message: str) -> bool:
+    """Whether message asks for Markdown formatting (cached per message)."""
+    return bool(_TRIGGER_RE.search(message))
+
+
+# Trigger prefixes stripped by _extract_content, applied in order
+_TRIGGER_PREFIX_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'format_markdown:\s*',
+        r'markdown:\s*',
+        r'convert to markdown:\s*',
+        r'to markdown:\s*',
+        r'as markdown:\s*',
+    )
+]
+
+# Code fence markers the LLM sometimes wraps its output in
+_OPENING_FENCE_MARKDOWN_RE = re.compile(r'^```markdown\s*')
+_OPENING_FENCE_RE = re.compile(r'^```\s*')
+_CLOSING_FENCE_RE = re.compile(r'\s*```$')
+
 
 class MarkdownFormatterAgent(BaseAgent):
     """Agent that formats text into well-structured Markdown."""
@@ -48,30 +102,7 @@ class MarkdownFormatterAgent(BaseAgent):
 
     def can_handle(self, message: str) -> bool:
         """Check if message is a markdown formatting request."""
-        message_lower = message.lower()
-
-        # Check for explicit triggers
-        if 'format_markdown:' in message_lower or 'markdown:' in message_lower:
-            return True
-
-        # Check for conversion patterns
-        if 'to markdown' in message_lower or 'as markdown' in message_lower:
-            return True
-
-        if 'convert to markdown' in message_lower:
-            return True
-
-        # Check for natural language formatting requests
-        if 'format' in message_lower and 'markdown' in message_lower:
-            return True
-
-        if 'beautify' in message_lower and 'markdown' in message_lower:
-            return True
-
-        if 'clean up' in message_lower and ('markdown' in message_lower or 'md' in message_lower):
-            return True
-
-        return False
+        return _is_markdown_request(message)
 
     def process(self, message: str, full_context: Dict[str, Any]) -> str:
         """Process markdown formatting request using LLM."""
@@ -99,44 +130,23 @@ class MarkdownFormatterAgent(BaseAgent):
         # Remove the trigger patterns
         content = message
 
-        # Remove format_markdown: prefix
-        content = re.sub(r'format_markdown:\s*', '', content, flags=re.IGNORECASE)
-
-        # Remove markdown: prefix
-        content = re.sub(r'markdown:\s*', '', content, flags=re.IGNORECASE)
-
-        # Remove conversion phrases
-        content = re.sub(r'convert to markdown:\s*', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'to markdown:\s*', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'as markdown:\s*', '', content, flags=re.IGNORECASE)
+        # Remove format_markdown:, markdown: and conversion phrase prefixes
+        for pattern in _TRIGGER_PREFIX_PATTERNS:
+            content = pattern.sub('', content)
 
         return content.strip()
 
     def _format_with_llm(self, content: str) -> str:
         """Use LLM to format content as Markdown."""
         try:
-            prompt = f"""You are a markdown formatting expert. Format the following content into well-structured Markdown.
-
-Content to format:
+            # Only the variable content goes in the user message (see _FORMAT_SYSTEM_MESSAGE)
+            prompt = f"""Content to format:
 {content}
 
-Instructions:
-- Use appropriate Markdown syntax (headings, lists, tables, code blocks, bold, italic, etc.)
-- Make it well-organized and easy to read
-- Use proper hierarchy with headings (# ## ###)
-- Create tables for tabular data
-- Use code blocks for code or technical content
-- Use bullet points or numbered lists where appropriate
-- Make it visually appealing and well-formatted
-- Return ONLY the formatted markdown, no explanations
-
 Formatted Markdown:"""
 
             messages = [
-                {
-                    "role": "system",
-                    "content": "You are a markdown formatting expert. Always respond with properly formatted Markdown syntax only."
-                },
+                _FORMAT_SYSTEM_MESSAGE,
                 {
                     "role": "user",
                     "content": prompt
@@ -158,12 +168,12 @@ Formatted Markdown:"""
 
             # Remove markdown code block markers if LLM added them
             if markdown_output.startswith('```markdown'):
-                markdown_output = re.sub(r'^```markdown\s*', '', markdown_output)
-                markdown_output = re.sub(r'\s*```$', '', markdown_output)
+                markdown_output = _OPENING_FENCE_MARKDOWN_RE.sub('', markdown_output)
+                markdown_output = _CLOSING_FENCE_RE.sub('', markdown_output)
                 markdown_output = markdown_output.strip()
             elif markdown_output.startswith('```'):
-                markdown_output = re.sub(r'^```\s*', '', markdown_output)
-                markdown_output = re.sub(r'\s*```$', '', markdown_output)
+                markdown_output = _OPENING_FENCE_RE.sub('', markdown_output)
+                markdown_output = _CLOSING_FENCE_RE.sub('', markdown_output)
                 markdown_output = markdown_output.strip()
 
             return markdown_output
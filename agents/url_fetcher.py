@@ -6,25 +6,50 @@ Fetches content from URLs and summarizes them using LM Studio.
 """
 
 import re
+import functools
 import requests
-from bs4 import BeautifulSoup
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 import sys
 import os
 
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 # Add parent directory to path to import base_agent
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from base_agent import BaseAgent
-from config import MAX_CONTENT_LENGTH, REQUEST_TIMEOUT, SUMMARY_MAX_TOKENS, SUMMARY_TEMPERATURE
-from llm_client import chat_completion
+from config import MAX_CONTENT_LENGTH, MAX_DOWNLOAD_BYTES, REQUEST_TIMEOUT, SUMMARY_MAX_TOKENS, SUMMARY_TEMPERATURE
+from agents._llm_cache import cached_chat_completion
 
 logger = logging.getLogger(__name__)
 
+# System prompt for page summaries; the fetched text is sent as the user message
+_SUMMARY_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a helpful assistant that creates concise, informative summaries. "
+               "Please provide a concise summary of the content you are given."
+}
+
+# Any http(s) URL, used for both routing and extraction
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+
+
+@functools.lru_cache(maxsize=256)
+def _contains_url(message: str) -> bool:
+    """Whether message contains an http(s) URL (cached per message)."""
+    return bool(_URL_RE.search(message))
+
 
 class URLFetcherAgent(BaseAgent):
     """Agent that fetches and summarizes web content."""
 
+    MAX_PARALLEL_FETCHES = 4  # URLs fetched/summarized at once when a message has several
+    MAX_URLS = 5  # URLs summarized per message; the rest are listed as skipped
+
     def get_name(self) -> str:
         return "url_fetcher"
 
@@ -43,16 +68,40 @@ class URLFetcherAgent(BaseAgent):
 
     def can_handle(self, message: str) -> bool:
         """Check if message contains a URL."""
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        return bool(re.search(url_pattern, message))
+        return _contains_url(message)
 
     def process(self, message: str, full_context: Dict[str, Any]) -> str:
-        """Fetch URL and return summary."""
-        # Extract URL
-        url = self._extract_url(message)
-        if not url:
+        """Fetch URL(s) and return summaries."""
+        # Extract URLs
+        urls = self._extract_urls(message)
+        if not urls:
             return "I couldn't find a valid URL in your message. Please provide a URL like: https://example.com/article"
 
+        # Each URL costs a download and an LLM call, so cap how many one message triggers
+        skipped = urls[self.MAX_URLS:]
+        urls = urls[:self.MAX_URLS]
+
+        if len(urls) == 1:
+            return self._summarize_url(urls[0])
+
+        # Several URLs: fetch and summarize them concurrently. Each one is
+        # dominated by network and LLM latency, and the LLM server can batch
+        # the overlapping requests.
+        logger.info(f"URL Fetcher Agent: Processing {len(urls)} URLs in parallel")
+        with ThreadPoolExecutor(max_workers=min(len(urls), self.MAX_PARALLEL_FETCHES)) as executor:
+            results = list(executor.map(self._summarize_url, urls))
+
+        if skipped:
+            logger.info(f"URL Fetcher Agent: Skipped {len(skipped)} URLs over the limit of {self.MAX_URLS}")
+            results.append(
+                f"Skipped {len(skipped)} more URL(s) (limit is {self.MAX_URLS} per message):\n"
+                + "\n".join(skipped)
+            )
+
+        return "\n\n".join(results)
+
+    def _summarize_url(self, url: str) -> str:
+        """Fetch a single URL and summarize it."""
         logger.info(f"URL Fetcher Agent: Processing URL: {url}")
 
         # Fetch content
@@ -63,11 +112,9 @@ class URLFetcherAgent(BaseAgent):
 
         return f"Summary of {url}:\n\n{summary}"
 
-    def _extract_url(self, text: str) -> str:
-        """Extract URL from text."""
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        urls = re.findall(url_pattern, text)
-        return urls[0] if urls else None
+    def _extract_urls(self, text: str) -> list:
+        """Extract all distinct URLs from text, in order of appearance."""
+        return list(dict.fromkeys(_URL_RE.findall(text)))
 
     def _fetch_website_content(self, url: str) -> str:
         """Fetch and extract text content from a URL."""
@@ -76,18 +123,19 @@ class URLFetcherAgent(BaseAgent):
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+            # Stream the body and stop at MAX_DOWNLOAD_BYTES; only the first
+            # MAX_CONTENT_LENGTH characters of text are kept anyway
+            body = bytearray()
+            with requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=65536):
+                    body.extend(chunk)
+                    if len(body) >= MAX_DOWNLOAD_BYTES:
+                        logger.info(f"Stopped download at {len(body)} bytes")
+                        break
 
             # Parse HTML and extract text
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-
-            # Get text
-            text = soup.get_text()
+            text = self._html_to_text(bytes(body))
 
             # Clean up text
             lines = (line.strip() for line in text.splitlines())
@@ -103,24 +151,40 @@ class URLFetcherAgent(BaseAgent):
             logger.error(f"Error fetching URL: {e}")
             return f"Error fetching URL: {str(e)}"
 
+    def _html_to_text(self, html: bytes) -> str:
+        """
+        Extract the visible text of an HTML document, minus scripts and styles.
+        Uses selectolax's C parser when installed, BeautifulSoup otherwise.
+        """
+        if HTMLParser is not None:
+            tree = HTMLParser(html)
+            for node in tree.css('script, style'):
+                node.decompose()
+            return tree.root.text() if tree.root is not None else ''
+
+        # Imported on first use so bs4 is only loaded when selectolax is missing
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+
+        return soup.get_text()
+
     def _summarize_with_lm_studio(self, content: str) -> str:
         """Send content to LM Studio for summarization."""
         try:
-            prompt = f"Please provide a concise summary of the following content:\n\n{content}"
-
             messages = [
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that creates concise, informative summaries."
-                },
+                _SUMMARY_SYSTEM_MESSAGE,
                 {
                     "role": "user",
-                    "content": prompt
+                    "content": content
                 }
             ]
 
             logger.info("Sending to LLM for summarization...")
-            summary = chat_completion(
+            summary = cached_chat_completion(
                 messages=messages,
                 temperature=SUMMARY_TEMPERATURE,
                 max_tokens=SUMMARY_MAX_TOKENS,
@@ -48,7 +48,17 @@ FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() in ('true', '1', 't')
 # Content Fetching Configuration
 MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', '4000'))
 REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '10'))
+# Max bytes of a web page downloaded before parsing (the rest is never read)
+MAX_DOWNLOAD_BYTES = int(os.getenv('MAX_DOWNLOAD_BYTES', str(512 * 1024)))
 
 # Summarization Configuration
 SUMMARY_MAX_TOKENS = int(os.getenv('SUMMARY_MAX_TOKENS', '500'))
 SUMMARY_TEMPERATURE = float(os.getenv('SUMMARY_TEMPERATURE', '0.7'))
+
+# Summary cache (skips the LLM call when the same content is summarized again)
+# Opt-in: set SUMMARY_CACHE_TTL to a number of seconds to enable; 0 disables
+SUMMARY_CACHE_TTL = int(os.getenv('SUMMARY_CACHE_TTL', '0'))
+SUMMARY_CACHE_PATH = os.getenv(
+    'SUMMARY_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'summary_cache.sqlite3')
+)
@@ -16,8 +16,12 @@ Usage:
 
 import os
 import re
+import sys
 import logging
-from typing import Optional, Dict
+import functools
+import threading
+from collections import defaultdict
+from typing import Optional, Dict, List
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
@@ -30,8 +34,44 @@ if os.path.exists(ENV_FILE):
 else:
     logger.info("No .env file found, using system environment variables only")
 
-# Cache for parsed credentials
-_credential_cache: Optional[Dict[str, str]] = None
+# Patterns used to normalize credential names
+_NONWORD_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
+# str.translate table deleting ASCII punctuation (anything but letters, digits,
+# underscore and whitespace); the fast path for _normalize_search_term
+_ASCII_PUNCTUATION = ''.join(c for c in map(chr, range(128)) if not (c.isalnum() or c.isspace() or c == '_'))
+_DELETE_PUNCTUATION = str.maketrans('', '', _ASCII_PUNCTUATION)
+
+
+class _CredentialSnapshot:
+    """
+    Parsed credentials plus the lookup structures derived from them.
+
+    Built in one go and never modified afterwards; reloading publishes a new
+    snapshot, so a lookup that holds one always sees consistent data.
+    """
+
+    __slots__ = ('credentials', 'word_index', 'compact_keys', 'key_tokens', 'sorted_names')
+
+    def __init__(self, credentials: Dict[str, str]):
+        self.credentials = credentials
+        # Reverse index: word -> keys containing that word (as an '_'-separated
+        # token), in credential order
+        self.word_index = _build_word_index(credentials)
+        # Keys with underscores removed: key -> compact key
+        self.compact_keys = {key: key.replace('_', '') for key in credentials}
+        # Words of each key as a set, for exact-token checks: key -> words
+        self.key_tokens = {key: frozenset(key.split('_')) for key in credentials}
+        # Sorted key names for list_credential_names()
+        self.sorted_names = tuple(sorted(credentials))
+
+
+# Current credential snapshot, None until first use
+_snapshot: Optional[_CredentialSnapshot] = None
+
+# Guards building the snapshot so concurrent requests parse .env only once
+_cache_lock = threading.Lock()
 
 
 def _parse_env_file() -> Dict[str, str]:
@@ -46,45 +86,40 @@ def _parse_env_file() -> Dict[str, str]:
     Returns:
         Dict mapping normalized keys to their values
     """
-    credentials = {}
-
-    # First, get all environment variables (already loaded by dotenv)
-    for key, value in os.environ.items():
-        if value and not key.startswith('_'):  # Skip empty and private vars
-            credentials[key.lower()] = value
+    # First, get all environment variables (already loaded by dotenv),
+    # skipping empty and private ('_'-prefixed) vars. Keys are interned since
+    # they are probed and compared on every lookup.
+    credentials = {sys.intern(key.lower()): value for key, value in os.environ.items() if value and key[:1] != '_'}
 
     # Additionally parse .env file for natural language format
     if os.path.exists(ENV_FILE):
         try:
-            with open(ENV_FILE, 'r') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-
-                    # Skip comments and empty lines
-                    if not line or line.startswith('#'):
-                        continue
-
-                    # Check for natural language format: "Name: value"
-                    natural_match = re.match(r'^([^:=]+?):\s*(.+)$', line)
-                    if natural_match:
-                        key_name = natural_match.group(1).strip()
-                        value = natural_match.group(2).strip()
-
-                        if value:  # Only store non-empty values
-                            # Normalize key: lowercase, remove special chars except underscore
-                            normalized_key = re.sub(r'[^\w\s]', '', key_name.lower())
-                            normalized_key = re.sub(r'\s+', '_', normalized_key)
-                            credentials[normalized_key] = value
-                            logger.debug(f"Loaded credential: {key_name} -> {normalized_key}")
-
-                    # Standard format: KEY=value (already handled by dotenv, but normalize)
-                    elif '=' in line and not line.startswith('export'):
-                        key_name = line.split('=')[0].strip()
-                        value = line.split('=', 1)[1].strip()
-
-                        if value:
-                            credentials[key_name.lower()] = value
-                            logger.debug(f"Loaded standard credential: {key_name}")
+            # .env files are small: one read, then split in memory
+            with open(ENV_FILE, 'rb') as f:
+                data = f.read().decode('utf-8', 'replace')
+
+            for line in data.splitlines():
+                line = line.strip()
+
+                # Skip comments and empty lines
+                if not line or line.startswith('#'):
+                    continue
+
+                # Only natural language format is parsed here: "Name: value"
+                # with no '=' before the ':'. Standard KEY=value lines were
+                # loaded into os.environ by dotenv and copied above.
+                key_name, sep, value = line.partition(':')
+                if not sep or not key_name or '=' in key_name:
+                    continue
+
+                key_name = key_name.strip()
+                value = value.strip()
+
+                if value:  # Only store non-empty values
+                    # Normalize key the same way lookups are normalized
+                    normalized_key = sys.intern(_normalize_search_term(key_name))
+                    credentials[normalized_key] = value
+                    logger.debug(f"Loaded credential: {key_name} -> {normalized_key}")
 
         except Exception as e:
             logger.error(f"Error parsing .env file: {e}")
@@ -93,29 +128,50 @@ def _parse_env_file() -> Dict[str, str]:
     return credentials
 
 
-def _get_credentials() -> Dict[str, str]:
-    """Get cached credentials or parse .env file."""
-    global _credential_cache
-    if _credential_cache is None:
-        _credential_cache = _parse_env_file()
-    return _credential_cache
+def _build_word_index(credentials: Dict[str, str]) -> Dict[str, List[str]]:
+    """Map every '_'-separated word of every key to the keys containing it."""
+    index = defaultdict(list)
+    for key in credentials:
+        for word in key.split('_'):
+            index[sys.intern(word)].append(key)
+    return dict(index)
+
 
+def _get_snapshot() -> _CredentialSnapshot:
+    """Get the current credential snapshot, parsing .env on first use."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        with _cache_lock:
+            if _snapshot is None:
+                _snapshot = _CredentialSnapshot(_parse_env_file())
+            snapshot = _snapshot
+    return snapshot
 
+
+@functools.lru_cache(maxsize=512)
 def _normalize_search_term(term: str) -> str:
     """
     Normalize search term for fuzzy matching.
 
+    Shared by .env key parsing and lookups, so repeated names are normalized once.
+
     Examples:
         "Airtable" -> "airtable"
         "discord bot" -> "discord_bot"
         "GitHub-Token" -> "github_token"
     """
-    normalized = re.sub(r'[^\w\s]', '', term.lower())
-    normalized = re.sub(r'\s+', '_', normalized)
-    return normalized
+    lowered = term.lower()
+    if lowered.isascii():
+        # Single C-level pass to drop punctuation, then join words with '_'
+        return '_'.join(lowered.translate(_DELETE_PUNCTUATION).split())
+
+    # Unicode punctuation/whitespace needs the full regex classes
+    normalized = _NONWORD_RE.sub('', lowered)
+    return _WS_RE.sub('_', normalized.strip())
 
 
-def _fuzzy_match(search_term: str, credentials: Dict[str, str]) -> Optional[str]:
+def _fuzzy_match(search_term: str, snapshot: _CredentialSnapshot) -> Optional[str]:
     """
     Fuzzy match search term against credential keys.
 
@@ -123,16 +179,17 @@ def _fuzzy_match(search_term: str, credentials: Dict[str, str]) -> Optional[str]
     1. Exact match (case-insensitive)
     2. Partial match (search term in key)
     3. Partial match without underscores (handles "openmeasures" vs "open_measures")
-    4. Keyword match (all words in search term appear in key)
+    4. Keyword match (all words in search term are words of the key)
     5. Reverse partial match
 
     Args:
         search_term: The term to search for (e.g., "airtable", "discord bot")
-        credentials: Dict of normalized keys to values
+        snapshot: Credentials and their lookup structures (see _CredentialSnapshot)
 
     Returns:
         The credential value if found, None otherwise
     """
+    credentials = snapshot.credentials
     normalized_search = _normalize_search_term(search_term)
 
     # Strategy 1: Exact match
@@ -147,21 +204,24 @@ def _fuzzy_match(search_term: str, credentials: Dict[str, str]) -> Optional[str]
             return value
 
     # Strategy 3: Partial match without underscores - handles "openmeasures" vs "open_measures"
-    # Remove underscores from both search and keys for comparison
+    # Remove underscores from both search and keys for comparison (keys precomputed)
     search_no_underscores = normalized_search.replace('_', '')
-    for key, value in credentials.items():
-        key_no_underscores = key.replace('_', '')
+    for key, key_no_underscores in snapshot.compact_keys.items():
         if search_no_underscores in key_no_underscores or key_no_underscores in search_no_underscores:
             logger.debug(f"Underscore-insensitive match found: '{search_term}' matches '{key}'")
-            return value
+            return credentials[key]
 
-    # Strategy 4: Keyword match - all words in search term appear in key
+    # Strategy 4: Keyword match - all words in search term are words of the key
+    # Only keys in the shortest posting list can match; check each with a subset test
     search_words = normalized_search.split('_')
     if len(search_words) > 1:
-        for key, value in credentials.items():
-            if all(word in key for word in search_words):
+        search_set = frozenset(search_words)
+        candidates = min((snapshot.word_index.get(word, ()) for word in search_set), key=len)
+        # Postings keep credential order, so the first hit is the first matching key
+        for key in candidates:
+            if search_set <= snapshot.key_tokens[key]:
                 logger.debug(f"Keyword match found: '{search_term}' matches '{key}'")
-                return value
+                return credentials[key]
 
     # Strategy 5: Reverse partial - key is substring of search term
     for key, value in credentials.items():
@@ -172,6 +232,25 @@ def _fuzzy_match(search_term: str, credentials: Dict[str, str]) -> Optional[str]
     return None
 
 
+@functools.lru_cache(maxsize=256)
+def _lookup_credential(name: str, snapshot: _CredentialSnapshot) -> Optional[str]:
+    """
+    Resolve a credential name to its value (memoized per name and snapshot).
+
+    Keying on the snapshot means a lookup still running during a reload can
+    only cache its result under the old snapshot, which is never asked again.
+    """
+    credentials = snapshot.credentials
+
+    # Fast path: exact environment variable name, e.g. "OPENAI_API_KEY"
+    value = credentials.get(name.lower())
+    if value:
+        return value
+
+    # Try fuzzy match
+    return _fuzzy_match(name, snapshot)
+
+
 def get_credential(name: str, default: Optional[str] = None) -> Optional[str]:
     """
     Get credential by name using fuzzy matching.
@@ -203,10 +282,7 @@ def get_credential(name: str, default: Optional[str] = None) -> Optional[str]:
         logger.warning("Empty credential name provided")
         return default
 
-    credentials = _get_credentials()
-
-    # Try fuzzy match
-    value = _fuzzy_match(name, credentials)
+    value = _lookup_credential(name, _get_snapshot())
 
     if value:
         logger.info(f"Found credential for '{name}' (value masked)")
@@ -237,8 +313,7 @@ def list_credential_names() -> list:
     Returns:
         List of credential key names
     """
-    credentials = _get_credentials()
-    return sorted(credentials.keys())
+    return list(_get_snapshot().sorted_names)
 
 
 def mask_secret(secret: str, visible_chars: int = 4) -> str:
@@ -289,9 +364,14 @@ def reload_credentials():
     Reload credentials from .env file.
     Call this if the .env file is modified while the application is running.
     """
-    global _credential_cache
-    _credential_cache = None
+    global _snapshot
+    # Update os.environ first so the new snapshot is built from the new values
     load_dotenv(ENV_FILE, override=True)
+    snapshot = _CredentialSnapshot(_parse_env_file())
+    with _cache_lock:
+        _snapshot = snapshot
+    # Entries for old snapshots can never be hit again; drop them
+    _lookup_credential.cache_clear()
     logger.info("Credentials reloaded from .env file")
 
 
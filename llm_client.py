@@ -11,8 +11,13 @@ Configuration via environment variables:
 """
 
 import os
+import json
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -27,22 +32,43 @@ from config import (
 # Determine LLM provider
 LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'lm_studio').lower()
 
-# Try to import LiteLLM if configured
-if LLM_PROVIDER == 'litellm':
-    try:
-        import litellm
-        LITELLM_AVAILABLE = True
-        logger.info("LiteLLM imported successfully")
-    except ImportError:
-        LITELLM_AVAILABLE = False
-        logger.warning("LiteLLM not available. Install with: pip install litellm")
-        logger.warning("Falling back to LM Studio")
-        LLM_PROVIDER = 'lm_studio'
-else:
-    LITELLM_AVAILABLE = False
+# LiteLLM is slow to import, so it is loaded by the first client that needs it
+# (see _import_litellm); None until then
+litellm = None
+LITELLM_AVAILABLE: Optional[bool] = None
 
-# Import requests for LM Studio fallback
-import requests
+# Optional: orjson for faster payload serialization and response parsing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Number of deterministic (temperature 0) completions kept in memory per client
+COMPLETION_CACHE_SIZE = 256
+
+# Upper bound on in-flight requests in chat_completion_many()
+MAX_CONCURRENT_COMPLETIONS = 8
+
+# Retry policy for LM Studio calls, shared by the blocking session and the async path
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.3
+_RETRY_STATUSES = (502, 503, 504)
+
+
+def _import_litellm() -> bool:
+    """Import LiteLLM on first use. Returns True if it is available."""
+    global litellm, LITELLM_AVAILABLE
+    if LITELLM_AVAILABLE is None:
+        try:
+            import litellm as litellm_module
+            litellm = litellm_module
+            LITELLM_AVAILABLE = True
+            logger.info("LiteLLM imported successfully")
+        except ImportError:
+            LITELLM_AVAILABLE = False
+            logger.warning("LiteLLM not available. Install with: pip install litellm")
+            logger.warning("Falling back to LM Studio")
+    return LITELLM_AVAILABLE
 
 
 class LLMClient:
@@ -56,6 +82,10 @@ class LLMClient:
             temperature=0.7,
             max_tokens=500
         )
+
+        # Or scoped, closing pooled connections afterwards
+        with LLMClient() as client:
+            response = client.chat_completion(messages=[...])
     """
 
     def __init__(self, provider: Optional[str] = None):
@@ -68,8 +98,12 @@ class LLMClient:
         """
         self.provider = provider or LLM_PROVIDER
 
+        # LRU of deterministic completions, see chat_completion()
+        self._cache: 'OrderedDict[tuple, str]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         # LiteLLM configuration
-        if self.provider == 'litellm' and LITELLM_AVAILABLE:
+        if self.provider == 'litellm' and _import_litellm():
             # Get LiteLLM model from env (e.g., "gpt-4", "claude-3-opus", "azure/gpt-4")
             self.model = os.getenv('LITELLM_MODEL', 'gpt-3.5-turbo')
 
@@ -85,8 +119,76 @@ class LLMClient:
             self.provider = 'lm_studio'  # Force to lm_studio if litellm not available
             self.model = LM_STUDIO_MODEL
             self.lm_studio_url = LM_STUDIO_URL
+
+            # Request fields that are the same on every call
+            self._payload_template = {
+                "model": self.model,
+                # Let llama.cpp (which LM Studio wraps) reuse the KV cache for
+                # the unchanged prompt prefix, e.g. a shared system message
+                "cache_prompt": True
+            }
+
+            # Imported here so LiteLLM-only processes never load requests
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            # Pooled keep-alive session: repeated calls reuse the connection
+            # instead of opening and closing one per completion
+            self._session = requests.Session()
+            self._session.headers.update({'Content-Type': 'application/json'})
+            # Retry connection failures and gateway errors (e.g. while a model is
+            # loading) with backoff; read timeouts are not retried since the
+            # server may still be generating
+            retries = Retry(
+                total=_RETRY_TOTAL,
+                read=0,
+                backoff_factor=_RETRY_BACKOFF,
+                status_forcelist=_RETRY_STATUSES,
+                allowed_methods=['POST'],
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
             logger.info(f"LM Studio initialized: {self.lm_studio_url}")
 
+    def list_models(self, timeout: int = 5) -> List[str]:
+        """
+        List the models that will serve requests.
+
+        For LM Studio this asks the server (GET /v1/models), since LM_STUDIO_MODEL is
+        often a placeholder and the loaded model can change while we run.
+
+        Raises:
+            Exception: If the server can't be queried
+        """
+        if self.provider == 'litellm':
+            return [self.model]
+
+        models_url = self.lm_studio_url.rsplit('/chat/completions', 1)[0] + '/models'
+        response = self._session.get(models_url, timeout=timeout)
+        response.raise_for_status()
+        return sorted(model['id'] for model in self._parse_body(response.content).get('data', []))
+
+    def close(self) -> None:
+        """Close pooled connections held by this client."""
+        session = getattr(self, '_session', None)
+        if session is not None:
+            session.close()
+            self._session = None
+
+    def clear_cache(self) -> None:
+        """Drop all memoized completions."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def __enter__(self) -> 'LLMClient':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -117,10 +219,148 @@ class LLMClient:
         if max_tokens is None:
             max_tokens = SUMMARY_MAX_TOKENS
 
+        key = self._memo_key(messages, temperature, max_tokens, kwargs)
+        cached = self._memo_get(key)
+        if cached is not None:
+            return cached
+
+        if self.provider == 'litellm':
+            content = self._call_litellm(messages, temperature, max_tokens, **kwargs)
+        else:
+            content = self._call_lm_studio(messages, temperature, max_tokens, timeout, **kwargs)
+
+        self._memo_put(key, content)
+        return content
+
+    def _memo_key(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        kwargs: Dict[str, Any]
+    ) -> Optional[tuple]:
+        """Memo key for a completion, or None if it shouldn't be memoized."""
+        # Only temperature 0 output is reproducible enough to memoize
+        if temperature > 0 or kwargs:
+            return None
+        try:
+            # Whole messages, so multimodal content and fields like name/tool_calls count
+            return (self.model, json.dumps(messages, sort_keys=True), temperature, max_tokens)
+        except (TypeError, ValueError):
+            return None  # Not JSON-serializable: just don't memoize
+
+    def _memo_get(self, key: Optional[tuple]) -> Optional[str]:
+        """Return the memoized completion for key, if any."""
+        if key is None:
+            return None
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                logger.info("Completion cache hit, skipping LLM call")
+            return cached
+
+    def _memo_put(self, key: Optional[tuple], content: Optional[str]) -> None:
+        """Memoize content under key, evicting the least recently used entry."""
+        if key is None or content is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = content
+            if len(self._cache) > COMPLETION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: int = 60,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+
+        Takes the same arguments as chat_completion(). Joining the yielded
+        strings gives the full response.
+
+        Raises:
+            Exception: If LLM call fails
+        """
+        if temperature is None:
+            temperature = SUMMARY_TEMPERATURE
+        if max_tokens is None:
+            max_tokens = SUMMARY_MAX_TOKENS
+
         if self.provider == 'litellm':
-            return self._call_litellm(messages, temperature, max_tokens, **kwargs)
+            return self._stream_litellm(messages, temperature, max_tokens, **kwargs)
         else:
-            return self._call_lm_studio(messages, temperature, max_tokens, timeout, **kwargs)
+            return self._stream_lm_studio(messages, temperature, max_tokens, timeout, **kwargs)
+
+    async def chat_completion_many(
+        self,
+        messages_list: List[List[Dict[str, str]]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: int = 60,
+        **kwargs
+    ) -> List[str]:
+        """
+        Run several chat completions concurrently.
+
+        Requests overlap on the wire instead of running back to back, with at most
+        MAX_CONCURRENT_COMPLETIONS in flight at a time. Memoization and retries
+        behave as for chat_completion().
+
+        Args:
+            messages_list: One messages list per completion
+            temperature, max_tokens, timeout, **kwargs: As for chat_completion()
+
+        Returns:
+            List[str]: Response contents, in the same order as messages_list
+
+        Raises:
+            Exception: If any LLM call fails
+        """
+        if temperature is None:
+            temperature = SUMMARY_TEMPERATURE
+        if max_tokens is None:
+            max_tokens = SUMMARY_MAX_TOKENS
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMPLETIONS)
+
+        # Optional: httpx for concurrent LM Studio calls
+        try:
+            import httpx
+        except ImportError:
+            httpx = None
+
+        # Without httpx (or for LiteLLM) fall back to the blocking client in worker threads
+        if self.provider == 'litellm' or httpx is None:
+            loop = asyncio.get_running_loop()
+
+            async def run_blocking(messages):
+                async with semaphore:
+                    # run_in_executor rather than asyncio.to_thread (3.9+) to keep Python 3.8 support
+                    return await loop.run_in_executor(None, functools.partial(
+                        self.chat_completion, messages, temperature, max_tokens, timeout, **kwargs
+                    ))
+
+            return await asyncio.gather(*(run_blocking(m) for m in messages_list))
+
+        # httpx clients are bound to the running event loop, so create one per batch
+        limits = httpx.Limits(max_connections=MAX_CONCURRENT_COMPLETIONS * 2)
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            async def run(messages):
+                key = self._memo_key(messages, temperature, max_tokens, kwargs)
+                cached = self._memo_get(key)
+                if cached is not None:
+                    return cached
+                async with semaphore:
+                    content = await self._acall_lm_studio(client, messages, temperature, max_tokens, **kwargs)
+                self._memo_put(key, content)
+                return content
+
+            return await asyncio.gather(*(run(m) for m in messages_list))
 
     def _call_litellm(
         self,
@@ -160,6 +400,94 @@ class LLMClient:
             logger.error(f"LiteLLM call failed: {e}")
             raise Exception(f"LiteLLM error: {str(e)}")
 
+    def _stream_litellm(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream a LiteLLM completion."""
+        litellm_kwargs = {
+            'model': self.model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'stream': True,
+        }
+        if self.api_base:
+            litellm_kwargs['api_base'] = self.api_base
+        litellm_kwargs.update(kwargs)
+
+        try:
+            for chunk in litellm.completion(**litellm_kwargs):
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        except Exception as e:
+            logger.error(f"LiteLLM stream failed: {e}")
+            raise Exception(f"LiteLLM error: {str(e)}")
+
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> bytes:
+        """Build and serialize an LM Studio request body."""
+        payload = {
+            **self._payload_template,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+        # Add any additional kwargs
+        payload.update(kwargs)
+
+        # Pre-serialize the body; requests are sent with Content-Type: application/json
+        if orjson is not None:
+            return orjson.dumps(payload)
+        return json.dumps(payload).encode('utf-8')
+
+    @staticmethod
+    def _parse_body(content: bytes) -> Any:
+        """Parse a JSON response body."""
+        return orjson.loads(content) if orjson is not None else json.loads(content)
+
+    def _stream_lm_studio(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        timeout: int,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream an LM Studio completion from its server-sent events."""
+        body = self._build_payload(messages, temperature, max_tokens, stream=True, **kwargs)
+
+        try:
+            logger.info(f"Streaming from LM Studio: {self.lm_studio_url}")
+            with self._session.post(self.lm_studio_url, data=body, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    # SSE: only "data:" lines carry chunks; skip blanks and comments
+                    if not line.startswith(b'data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == b'[DONE]':
+                        break
+                    choices = self._parse_body(data).get('choices')
+                    if choices:
+                        content = choices[0].get('delta', {}).get('content')
+                        if content:
+                            yield content
+
+        except Exception as e:
+            logger.error(f"LM Studio stream failed: {e}")
+            raise Exception(f"LM Studio error: {str(e)}")
+
     def _call_lm_studio(
         self,
         messages: List[Dict[str, str]],
@@ -172,24 +500,14 @@ class LLMClient:
         try:
             logger.info(f"Calling LM Studio: {self.lm_studio_url}")
 
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens
-            }
-
-            # Add any additional kwargs
-            payload.update(kwargs)
-
-            response = requests.post(
+            response = self._session.post(
                 self.lm_studio_url,
-                json=payload,
+                data=self._build_payload(messages, temperature, max_tokens, **kwargs),
                 timeout=timeout
             )
             response.raise_for_status()
 
-            result = response.json()
+            result = self._parse_body(response.content)
             content = result['choices'][0]['message']['content']
             logger.info("LM Studio call successful")
             return content
@@ -198,9 +516,49 @@ class LLMClient:
             logger.error(f"LM Studio call failed: {e}")
             raise Exception(f"LM Studio error: {str(e)}")
 
+    async def _acall_lm_studio(
+        self,
+        client: 'httpx.AsyncClient',
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> str:
+        """
+        Call LM Studio for completion through an httpx async client.
+        Retries connection failures and gateway errors like the blocking session does.
+        """
+        import httpx
+
+        try:
+            body = self._build_payload(messages, temperature, max_tokens, **kwargs)
+            headers = {'Content-Type': 'application/json'}
+
+            for attempt in range(_RETRY_TOTAL + 1):
+                retry = attempt < _RETRY_TOTAL
+                try:
+                    response = await client.post(self.lm_studio_url, content=body, headers=headers)
+                except httpx.ConnectError:
+                    if not retry:
+                        raise
+                else:
+                    if response.status_code not in _RETRY_STATUSES or not retry:
+                        break
+                await asyncio.sleep(_RETRY_BACKOFF * (2 ** attempt))
+
+            response.raise_for_status()
+
+            result = self._parse_body(response.content)
+            return result['choices'][0]['message']['content']
+
+        except Exception as e:
+            logger.error(f"LM Studio call failed: {e}")
+            raise Exception(f"LM Studio error: {str(e)}")
+
 
 # Global client instance
 _global_client = None
+_global_client_lock = threading.Lock()
 
 
 def get_llm_client() -> LLMClient:
@@ -212,7 +570,10 @@ def get_llm_client() -> LLMClient:
     """
     global _global_client
     if _global_client is None:
-        _global_client = LLMClient()
+        # Agents call this from worker threads; build the client (and its pooled session) once
+        with _global_client_lock:
+            if _global_client is None:
+                _global_client = LLMClient()
     return _global_client
 
 
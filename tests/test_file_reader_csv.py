@@ -0,0 +1,27 @@
+"""The pyarrow CSV preview must match the csv module's output."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.file_reader import FileReaderAgent
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("data", [
+    "name,age\nbob,30\nann,31\n",
+    "1,2\n3,4.0\n5,007\n",
+    ",x\n1,\n,2\n",
+    "a,b\n\"1,5\",\"\"\nTRUE,null\n",
+    "\na,b\n\n1,2\n",
+    "",
+])
+def test_pyarrow_rows_match_csv_module(tmp_path, data):
+    path = tmp_path / "data.csv"
+    path.write_text(data, encoding="utf-8")
+    agent = FileReaderAgent()
+
+    assert agent._read_csv_rows_pyarrow(str(path), 100) == agent._read_csv_rows(str(path), 100)
@@ -0,0 +1,75 @@
+"""Behaviour of the opt-in summary cache in front of chat_completion()."""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents import _llm_cache
+
+MESSAGES = [{"role": "user", "content": "Summarize this"}]
+
+
+@pytest.fixture
+def llm_calls(tmp_path, monkeypatch):
+    """Enable the cache on a temporary database and record LLM calls."""
+    calls = []
+
+    def fake_chat_completion(messages, temperature, max_tokens, timeout):
+        calls.append(messages)
+        return f"summary {len(calls)}"
+
+    monkeypatch.setattr(_llm_cache, "SUMMARY_CACHE_TTL", 3600)
+    monkeypatch.setattr(_llm_cache, "SUMMARY_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(_llm_cache, "_local", threading.local())
+    monkeypatch.setattr(_llm_cache, "_active_model", lambda: "model-a")
+    monkeypatch.setattr(_llm_cache, "chat_completion", fake_chat_completion)
+    return calls
+
+
+def test_hit_skips_llm_call(llm_calls):
+    assert _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500) == "summary 1"
+    assert _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500) == "summary 1"
+    assert len(llm_calls) == 1
+
+
+def test_model_change_misses(llm_calls, monkeypatch):
+    _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500)
+    monkeypatch.setattr(_llm_cache, "_active_model", lambda: "model-b")
+    assert _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500) == "summary 2"
+
+
+def test_expired_entry_misses(llm_calls, monkeypatch):
+    monkeypatch.setattr(_llm_cache, "SUMMARY_CACHE_TTL", -1)  # stored already expired
+    key = _llm_cache.make_key(MESSAGES, 0.7, 500, "model-a")
+    _llm_cache.put(key, "stale")
+    assert _llm_cache.get(key) is None
+
+
+def test_disabled_always_calls_llm(llm_calls, monkeypatch):
+    monkeypatch.setattr(_llm_cache, "SUMMARY_CACHE_TTL", 0)
+    _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500)
+    _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500)
+    assert len(llm_calls) == 2
+    assert not os.path.exists(_llm_cache.SUMMARY_CACHE_PATH)
+
+
+def test_unknown_model_bypasses_cache(llm_calls, monkeypatch):
+    monkeypatch.setattr(_llm_cache, "_active_model", lambda: None)
+    _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500)
+    _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500)
+    assert len(llm_calls) == 2
+
+
+def test_errors_are_not_cached(llm_calls, monkeypatch):
+    def failing_chat_completion(**kwargs):
+        raise Exception("LM Studio error: boom")
+
+    monkeypatch.setattr(_llm_cache, "chat_completion", failing_chat_completion)
+    with pytest.raises(Exception, match="boom"):
+        _llm_cache.cached_chat_completion(MESSAGES, 0.7, 500)
+
+    key = _llm_cache.make_key(MESSAGES, 0.7, 500, "model-a")
+    assert _llm_cache.get(key) is None